@@ -11,11 +11,22 @@ File format:
 
 Usage:
     python plot_diag1.py
+    BATCH=1 python plot_diag1.py   # save the PNG only, no window
 """
 
-import matplotlib.pyplot as plt
-import numpy as np
 import os
+import sys
+import numpy as np
+import matplotlib
+# BATCH=1, or Linux with no X11/Wayland display, only saves the PNG (MPLBACKEND wins)
+batch_mode = os.environ.get('BATCH') == '1' or (
+    sys.platform.startswith('linux')
+    and not (os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY')))
+if batch_mode and not os.environ.get('MPLBACKEND'):
+    matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
+from matplotlib.lines import Line2D
 
 # ============================================================================
 # CONFIGURATION
@@ -34,12 +45,37 @@ labels = [
 # Define colors for each line
 colors = ['blue', 'red', 'green', 'orange']
 
+# Maximum number of points drawn per line (long runs are downsampled)
+max_points = 2000
+
+# ============================================================================
+# HELPER FUNCTIONS
+# ============================================================================
+def minmax_downsample(x, y, n_out):
+    """Reduce (x, y) to about n_out points, keeping the min and max of y in
+    each bin (plus the first and last samples) so that peaks, dips and the
+    final value remain visible in the plot."""
+    n = len(y)
+    if n <= n_out:
+        return x, y
+    n_bins = max(n_out // 2 - 1, 1)
+    size = n // n_bins
+    blocks = y[:n_bins * size].reshape(n_bins, size)
+    offsets = np.arange(n_bins) * size
+    idx = [[0, n - 1], offsets + blocks.argmin(axis=1), offsets + blocks.argmax(axis=1)]
+    tail = y[n_bins * size:]  # leftover samples that do not fill a bin
+    if tail.size:
+        idx.append(n_bins * size + np.array([tail.argmin(), tail.argmax()]))
+    idx = np.unique(np.concatenate(idx))
+    return x[idx], y[idx]
+
 # ============================================================================
 # READ DATA FROM EACH EXERCISE
 # ============================================================================
 print("Reading CO2 flux data from diag1 files...")
 
-data = []  # Store data for each exercise
+times = []   # Time series for each exercise (None if missing)
+fluxes = []  # Flux series for each exercise (None if missing)
 
 for i, ex in enumerate(exercises):
     # Construct the full path to the diag1 file
@@ -48,12 +84,16 @@ for i, ex in enumerate(exercises):
     # Check if the file exists
     if os.path.exists(filepath):
         # Load data: column 0 = time, column 1 = flux
-        time, flux = np.loadtxt(filepath, unpack=True)
-        data.append({'time': time, 'flux': flux, 'label': labels[i], 'color': colors[i]})
+        arr = np.loadtxt(filepath, dtype=np.float32, usecols=(0, 1), ndmin=2)
+        time = np.ascontiguousarray(arr[:, 0])
+        flux = np.ascontiguousarray(arr[:, 1])
+        times.append(time)
+        fluxes.append(flux)
         print(f"  ✓ Loaded {filepath}: {len(time)} data points")
     else:
         print(f"  ✗ Warning: {filepath} not found, skipping...")
-        data.append(None)
+        times.append(None)
+        fluxes.append(None)
 
 # ============================================================================
 # CREATE THE PLOT
@@ -61,18 +101,35 @@ for i, ex in enumerate(exercises):
 print("\nCreating plot...")
 
 # Create a figure with larger size for better readability
-plt.figure(figsize=(10, 6))
-
-# Plot each dataset
-for i, dataset in enumerate(data):
-    if dataset is not None:
-        plt.plot(dataset['time'], dataset['flux'],
-                 label=dataset['label'],
-                 color=dataset['color'],
-                 linewidth=2,
-                 marker='o',
-                 markersize=3,
-                 markevery=10)  # Show marker every 10 points
+# (constrained layout prevents label cutoff without re-rendering on save)
+plt.figure(figsize=(10, 6), constrained_layout=True)
+
+# Plot all datasets as a single collection of lines; series with a single
+# sample cannot form a line and are drawn together as markers instead
+segments = []     # (N, 2) arrays of (time, flux) points
+line_colors = []
+points = []       # (time, flux) of single-sample series
+point_colors = []
+handles = []      # Legend entries (one per plotted exercise)
+for i in range(len(exercises)):
+    if times[i] is None:
+        continue
+    if len(times[i]) < 2:
+        points.append((times[i][0], fluxes[i][0]))
+        point_colors.append(colors[i])
+        handles.append(Line2D([], [], color=colors[i], marker='o', linestyle='none',
+                              label=labels[i]))
+        continue
+    t_ds, f_ds = minmax_downsample(times[i], fluxes[i], max_points)
+    segments.append(np.column_stack([t_ds, f_ds]))
+    line_colors.append(colors[i])
+    handles.append(Line2D([], [], color=colors[i], linewidth=2, label=labels[i]))
+
+ax = plt.gca()
+ax.add_collection(LineCollection(segments, colors=line_colors, linewidths=2))
+if points:
+    ax.scatter(*np.array(points).T, c=point_colors, zorder=3)
+ax.autoscale()
 
 # ============================================================================
 # CUSTOMIZE THE PLOT
@@ -80,20 +137,19 @@ for i, dataset in enumerate(data):
 plt.xlabel('Time (s)', fontsize=12, fontweight='bold')
 plt.ylabel('CO2 Flux (mmol/s)?', fontsize=12, fontweight='bold')
 plt.title('CO2 Diffusive Flux at Leaf Surface', fontsize=14, fontweight='bold')
-plt.legend(loc='best', frameon=True, shadow=True, fontsize=10)
+plt.legend(handles=handles, loc='best', frameon=True, shadow=True, fontsize=10)
 plt.grid(True, alpha=0.3, linestyle='--')
 
-# Add tight layout to prevent label cutoff
-plt.tight_layout()
-
 # ============================================================================
 # SAVE AND DISPLAY THE PLOT
 # ============================================================================
-# Save the figure as a high-resolution PNG
+# Save the figure as a PNG (light compression keeps saving fast)
 output_file = 'co2_flux_comparison.png'
-plt.savefig(output_file, dpi=300, bbox_inches='tight')
+plt.savefig(output_file, dpi=150,
+            pil_kwargs={'compress_level': 3, 'optimize': False})
 print(f"\n✓ Plot saved as: {output_file}")
 
 # Display the plot
-plt.show()
+if not batch_mode:
+    plt.show()
 print("\n✓ Done!")
@@ -1,81 +1,97 @@
 # %%
 import numpy as np
+import functools
 import glob
 import os
+import re
+import matplotlib
 import matplotlib.pyplot as plt
 from matplotlib.patches import Arc
 #%%
 plt.rc('font', family='serif')
 plt.rc('xtick', labelsize='20')
 plt.rc('ytick', labelsize='20')
-plt.rc('text', usetex=True)
+# built-in mathtext with Computer Modern (no external LaTeX process)
+plt.rc('mathtext', fontset='cm')
+# PNG encoding options: light zlib compression is much faster to write
+png_kwargs = {'compress_level': 3, 'optimize': False}
+# Close figures after saving only in batch runs (BATCH=1 or the Agg
+# backend); otherwise keep them open so cell/inline use still shows them
+close_figs = os.environ.get('BATCH') == '1' or matplotlib.get_backend().lower() == 'agg'
 # %% # --------------------------------------------------------- #
 grid = 129
 file_dir = os.path.dirname(os.path.realpath(__file__))
 case_dir = file_dir + "/W12"
-Slice_files = case_dir + "/slice_50"
-Slice = np.fromfile(Slice_files, dtype = float).reshape(3, grid, grid)
 #%% determine the circle area - create x, y index
 xi = np.linspace(0, 100, grid)
 yi = np.linspace(0, 100, grid)
 by = 30
+c_sto_ind = int(grid * 52./100.)
 # Roof parameters (from Green2D.c)
 NUM_WAVES = 2
 ROOF_BASE = 70.
 ROOF_AMPLITUDE = 15.
 ROOF_CENTER = ROOF_BASE + ROOF_AMPLITUDE
-# Calculate roof shape
-X, Y = np.meshgrid(xi, yi)
-y_roof = ROOF_CENTER + ROOF_AMPLITUDE * np.cos(2 * np.pi * NUM_WAVES * X / 100.)
-# %% plot the cw profile
-c_sto_ind = int(grid * 52./100.)
-fig1 = plt.figure(figsize=(6, 8))
-ax = fig1.add_subplot(1,1,1)
-ax.plot(Slice[0,c_sto_ind,:], yi, linewidth = 2)
-ax.plot(Slice[0,1,:],  yi, linewidth = 2)
-ax.set_xlabel(r'$c_w$', fontsize = 20)
-ax.set_ylabel(r'$y$', fontsize = 20)
-ax.axhline(y=by, color='k', linestyle='--')
-plt.grid(linestyle = ':')
-plt.tight_layout()
-plt.savefig("profile_cw0.png")
-# %% plot the ux profile
-fig1 = plt.figure(figsize=(6, 8))
-ax = fig1.add_subplot(1,1,1)
-ax.plot(Slice[1,c_sto_ind,:], yi, linewidth = 2)
-ax.plot(Slice[1,1,:], yi, linewidth = 2)
-ax.set_xlabel(r'$u_{x}$', fontsize = 20)
-ax.set_ylabel(r'$y$', fontsize = 20)
-ax.axhline(y=by, color='k', linestyle='--')
-plt.grid(linestyle = ':')
-plt.tight_layout()
-plt.savefig('profile_Ux.png')
-# %% plot 2D slice of cw
-fig2 = plt.figure(figsize=(10, 8))
-ax = fig2.add_subplot(1,1,1)
-# Mask data above roof
-cw_data = Slice[0,:,:].T.copy()
-cw_data[Y > y_roof] = np.nan
-im = ax.contourf(X, Y, cw_data, levels=20, cmap='Blues')
-plt.colorbar(im, ax=ax, label=r'$c_w$')
-ax.plot(xi, y_roof[0,:], 'k-', linewidth=2, label='Roof')
-ax.set_xlabel(r'$x$', fontsize = 20)
-ax.set_ylabel(r'$y$', fontsize = 20)
-ax.axhline(y=by, color='k', linestyle='--')
-plt.tight_layout()
-plt.savefig('2D_slice_cw.png')
-# %% plot 2D slice of ux
-fig3 = plt.figure(figsize=(10, 8))
-ax = fig3.add_subplot(1,1,1)
-# Mask data above roof
-ux_data = Slice[1,:,:].T.copy()
-ux_data[Y > y_roof] = np.nan
-im = ax.contourf(X, Y, ux_data, levels=20, cmap='RdBu_r')
-plt.colorbar(im, ax=ax, label=r'$u_x$')
-ax.plot(xi, y_roof[0,:], 'k-', linewidth=2, label='Roof')
-ax.set_xlabel(r'$x$', fontsize = 20)
-ax.set_ylabel(r'$y$', fontsize = 20)
-ax.axhline(y=by, color='k', linestyle='--')
-plt.tight_layout()
-plt.savefig('2D_slice_ux.png')
+# Calculate roof shape (depends on x only, broadcast against y when masking)
+k_roof = 2 * np.pi * NUM_WAVES / 100.
+y_roof_1d = ROOF_CENTER + ROOF_AMPLITUDE * np.cos(k_roof * xi)
+roof_mask = yi[:, None] > y_roof_1d[None, :]
+# %% load a slice file (cached on path and modification time, so re-running
+# the cells only maps a file again when the simulation has rewritten it)
+@functools.lru_cache(maxsize=8)
+def load_slice(path, mtime):
+    return np.memmap(path, dtype = np.float64, mode = 'r', shape = (3, grid, grid))
+# %% plot the profiles and 2D slices of one slice file
+def plot_slice(path, out_prefix, c_sto_ind):
+    Slice = load_slice(path, os.path.getmtime(path))
+    # profile lines at x index c_sto_ind and next to the wall
+    cw_line = Slice[0, c_sto_ind, :]
+    cw_wall = Slice[0, 1, :]
+    ux_line = Slice[1, c_sto_ind, :]
+    ux_wall = Slice[1, 1, :]
+    # cw and ux profiles side by side
+    fig, (ax_cw, ax_ux) = plt.subplots(1, 2, figsize=(12, 8), constrained_layout=True)
+    ax_cw.plot(cw_line, yi, linewidth = 2)
+    ax_cw.plot(cw_wall, yi, linewidth = 2)
+    ax_cw.set_xlabel(r'$c_w$', fontsize = 20)
+    ax_cw.set_ylabel(r'$y$', fontsize = 20)
+    ax_ux.plot(ux_line, yi, linewidth = 2)
+    ax_ux.plot(ux_wall, yi, linewidth = 2)
+    ax_ux.set_xlabel(r'$u_{x}$', fontsize = 20)
+    for ax in (ax_cw, ax_ux):
+        ax.axhline(y=by, color='k', linestyle='--')
+        ax.grid(linestyle = ':')
+    fig.savefig(out_prefix + 'profiles.png', pil_kwargs=png_kwargs)
+    if close_figs:
+        plt.close(fig)
+    # 2D slices of cw and ux, masked above the roof
+    for var, name, label, cmap in ((0, 'cw', r'$c_w$', 'Blues'),
+                                   (1, 'ux', r'$u_x$', 'RdBu_r')):
+        fig, ax = plt.subplots(figsize=(10, 8), constrained_layout=True)
+        data = np.where(roof_mask, np.nan, Slice[var].T)
+        im = ax.pcolormesh(xi, yi, data, cmap=cmap, shading='auto', rasterized=True)
+        fig.colorbar(im, ax=ax, label=label)
+        ax.plot(xi, y_roof_1d, 'k-', linewidth=2, label='Roof')
+        ax.set_xlabel(r'$x$', fontsize = 20)
+        ax.set_ylabel(r'$y$', fontsize = 20)
+        ax.axhline(y=by, color='k', linestyle='--')
+        fig.savefig(out_prefix + '2D_slice_' + name + '.png', pil_kwargs=png_kwargs)
+        if close_figs:
+            plt.close(fig)
+# %% plot every slice file of the case
+# raw slice dumps are named slice_%g of the output time (e.g. slice_80,
+# slice_12.5); the PNGs written next to them are skipped
+slice_names = re.compile(r'slice_\d+(\.\d+)?(e[+-]\d+)?')
+slice_nbytes = 3 * grid * grid * np.dtype(np.float64).itemsize
+slice_paths = [path for path in sorted(glob.glob(case_dir + "/slice_*"))
+               if slice_names.fullmatch(os.path.basename(path))]
+if not slice_paths:
+    print(f"Warning: no slice files found in {case_dir}")
+for Slice_files in slice_paths:
+    nbytes = os.path.getsize(Slice_files)
+    if nbytes != slice_nbytes:
+        print(f"Warning: skipping {Slice_files}: {nbytes} bytes, expected {slice_nbytes} "
+              f"for a {grid}x{grid} slice (does grid match res in Green2D.c?)")
+        continue
+    plot_slice(Slice_files, os.path.basename(Slice_files) + '_', c_sto_ind)
 # %%